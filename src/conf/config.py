@@ -1,3 +1,5 @@
+import functools
+
 import redis.asyncio
 import cloudinary
 
@@ -7,7 +9,11 @@ from pydantic_settings import BaseSettings
 
 load_dotenv()
 
+@functools.cache
 def init_cloudinary():
+    """
+    Configures the cloudinary client once per process; later calls do nothing.
+    """
     cloudinary.config(
         cloud_name=settings.cloudinary_name,
         api_key=settings.cloudinary_api_key,
@@ -29,6 +35,7 @@ class Settings(BaseSettings):
     postgres_db: str = "postgres"
     postgres_domain: str = "localhost"
     postgres_port: int = 5432
+    postgres_pgbouncer: bool = False
     
     secret_key: str = "secret_key"
     algorithm: str = "HS256"
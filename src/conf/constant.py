@@ -1,2 +1,10 @@
 ACCESS_TOKEN_TTL = 900
 REFRESH_TOKEN_TTL = 604800
+
+LARGE_PICTURE_SIZE = 1_000_000
+CLOUDINARY_CHUNK_SIZE = 6_000_000
+
+TAG_CACHE_TTL = 300
+TAG_CACHE_SIZE = 10_000
+
+PROFILE_CACHE_TTL = 300
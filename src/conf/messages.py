@@ -151,9 +151,10 @@ class Message:
 
     def __init__(self, language="EN"):
         self.language = language.upper()
+        self._language_messages = self.messages.get(self.language, {})
 
     def get_message(self, message: str):
-        return self.messages.get(self.language, {}).get(message, "This is not correct key for message")
+        return self._language_messages.get(message, "This is not correct key for message")
 
 
 messages = Message(language=select_language)
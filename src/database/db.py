@@ -1,7 +1,10 @@
 import contextlib
 from typing import AsyncIterator
+from uuid import uuid4
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from src.conf.config import settings
 
@@ -35,10 +38,38 @@ class DatabaseSessionManager:
         """
         Initializes the DatabaseSessionManager with a given database URL.
 
+        The connection pool keeps 20 connections and allows 10 more under load; a request waits at most
+        30 seconds for a free connection before failing. Connections are checked before use and recycled
+        after 30 minutes. These settings only apply to PostgreSQL; other backends, such as the SQLite database
+        used in tests, keep their default pools.
+        When the database is reached through PgBouncer in transaction mode, PgBouncer does the pooling, so
+        connections are not pooled here (NullPool). Consecutive transactions may also run on different server
+        connections, so asyncpg's statement caches are disabled and every prepared statement gets a unique
+        name, which keeps the names from colliding on a shared server connection.
+
         :param url: The SQLAlchemy database URL.
         :type url: str
         """
-        self._engine: AsyncEngine | None = create_async_engine(url)
+        engine_options = {}
+        if make_url(url).get_backend_name() == "postgresql":
+            if settings.postgres_pgbouncer:
+                engine_options = dict(
+                    poolclass=NullPool,
+                    connect_args={
+                        "statement_cache_size": 0,
+                        "prepared_statement_cache_size": 0,
+                        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+                    },
+                )
+            else:
+                engine_options = dict(
+                    pool_size=20,
+                    max_overflow=10,
+                    pool_timeout=30,
+                    pool_pre_ping=True,
+                    pool_recycle=1800,
+                )
+        self._engine: AsyncEngine | None = create_async_engine(url, **engine_options)
         self._session_maker: async_sessionmaker | None = async_sessionmaker(
             autocommit=False, autoflush=False, expire_on_commit=False, bind=self._engine
         )
@@ -2,7 +2,7 @@ import enum
 from datetime import datetime, timedelta
 from typing import List
 
-from sqlalchemy import (Boolean, Column, DateTime, Enum, Float, Integer,
+from sqlalchemy import (Boolean, Column, DateTime, Enum, Float, Index, Integer,
                         String, Table, event, func)
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -49,6 +49,8 @@ picture_tags = Table(
 
 class User(Base, BaseWithTimestamps):
     __tablename__ = "users"
+    # fetch id and timestamps with RETURNING on flush, so writes don't need a refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     username: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
     email: Mapped[str] = mapped_column(String(150), nullable=False, unique=True)
@@ -114,6 +116,13 @@ class Rating(Base, BaseWithTimestamps):
     picture: Mapped[int] = relationship("Picture", back_populates="ratings", lazy="joined")
 
 
+# comments of a picture, newest first
+Index("ix_comments_picture_created", Comment.picture_id, Comment.created_at.desc())
+Index("ix_comments_user", Comment.user_id)
+Index("ix_pictures_user", Picture.user_id)
+Index("ix_ratings_picture_user", Rating.picture_id, Rating.user_id)
+
+
 class InvalidToken(Base, BaseWithTimestamps):
     __tablename__ = "invalid_tokens"
 
@@ -1,5 +1,7 @@
-from typing import Sequence
-from sqlalchemy import select
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Dict, List, Sequence
+from sqlalchemy import delete, select
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -64,45 +66,79 @@ async def update_comment(picture_id: int, comment_id: int, body: CommentUpdate,
     return comment
 
 
-async def delete_comment(comment_id: int, picture_id: int, db: AsyncSession) -> Comment:
+async def delete_comment(comment_id: int, picture_id: int, db: AsyncSession) -> int | None:
     """
     The delete_comment function deletes a comment from the database.
+    It runs a single DELETE ... RETURNING statement, so the comment is not loaded before it is deleted.
 
     :param comment_id: int: Identify the comment to be deleted
+    :param picture_id: int: The id of the picture the comment belongs to
     :param db: AsyncSession: Pass the database session to the function
-    :return: None
+    :return: The id of the deleted comment or none if there is no such comment
     """
 
-    comment_query = select(Comment).join(Picture).filter(Comment.id == comment_id, Picture.id == picture_id)
-    existing_comment = await db.execute(comment_query)
-    comment = existing_comment.scalar()
-    if not comment:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("COMMENT_NOT_FOUND"))
+    stmt = delete(Comment).where(Comment.id == comment_id, Comment.picture_id == picture_id).returning(Comment.id)
     try:
-        await db.delete(comment)
+        result = await db.execute(stmt)
+        deleted_id = result.scalar_one_or_none()
         await db.commit()
-        return comment
+        return deleted_id
     except Exception as error:
         await db.rollback()
         raise error
 
 
-async def get_comments_to_picture(skip: int, limit: int, picture_id: int, db: AsyncSession) -> Sequence[Comment]:
+async def get_comments_to_picture(
+    skip: int, limit: int, picture_id: int, db: AsyncSession, since: datetime | None = None
+) -> Sequence[Comment]:
     """
     The get_comments_to_picture function returns a list of comments to the picture with id = picture_id.
     The function takes three arguments: skip, limit and picture_id.
     Skip is an integer that indicates how many comments should be skipped before returning the result.
     Limit is an integer that indicates how many comments should be returned in total (after skipping).
     Picture_id is an integer that represents the id of a particular picture.
+    Comments are returned newest first. If since is given, only comments created after it are returned, oldest first,
+    so a client can poll for new comments. Both orders follow the (picture_id, created_at) index, so no sort is needed.
+    created_at is stored as naive UTC, so a timezone-aware since is converted to UTC and compared without its offset.
 
     :param skip: int: Skip the first n comments
     :param limit: int: Limit the number of comments returned
     :param picture_id: int: Get comments to a specific picture
     :param db: AsyncSession: Pass the database session to the function
+    :param since: datetime | None: Return only comments created after this moment
     :return: A list of comments
     """
 
-    query = select(Comment).where(Comment.picture_id == picture_id).offset(skip).limit(limit)
+    query = select(Comment).where(Comment.picture_id == picture_id)
+    if since is not None:
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        query = query.where(Comment.created_at > since).order_by(Comment.created_at)
+    else:
+        query = query.order_by(Comment.created_at.desc())
+    query = query.offset(skip).limit(limit)
     comments = await db.execute(query)
     result = comments.scalars().all()
     return result
+
+
+async def get_comments_for_pictures(picture_ids: List[int], db: AsyncSession) -> Dict[int, List[Comment]]:
+    """
+    The get_comments_for_pictures function returns the comments of several pictures with a single query.
+    Comments are grouped by picture id, newest first. Pictures without comments map to an empty list.
+
+    :param picture_ids: List[int]: The ids of the pictures
+    :param db: AsyncSession: Pass the database session to the function
+    :return: A dict that maps each picture id to its comments
+    """
+
+    query = (
+        select(Comment)
+        .where(Comment.picture_id.in_(picture_ids))
+        .order_by(Comment.picture_id, Comment.created_at.desc())
+    )
+    comments = await db.execute(query)
+    result: Dict[int, List[Comment]] = {picture_id: [] for picture_id in picture_ids}
+    for picture_id, picture_comments in groupby(comments.scalars().unique().all(), key=lambda comment: comment.picture_id):
+        result[picture_id] = list(picture_comments)
+    return result
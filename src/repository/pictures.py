@@ -1,7 +1,9 @@
+import asyncio
 from typing import Sequence
 
 from fastapi import HTTPException, status
 from sqlalchemy import join, outerjoin, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -43,23 +45,18 @@ async def save_data_of_picture_to_db(body: PictureUpload, picture_url: str, user
 async def get_or_create_tag(db: AsyncSession, tag_name: str) -> Tag:
     """
     The get_or_create_tag function takes a database session and a tag name as arguments.
-    It then queries the database for an existing tag with that name, returning it if found.
-    If no such tag exists, it creates one and returns that instead.
+    It inserts the tag and, if a tag with that name already exists, returns the existing one instead.
+    This is a single INSERT ... ON CONFLICT ... RETURNING statement, so concurrent uploads with the same new tag
+    can't fail on the unique tagname constraint. The insert is committed together with the picture.
 
     :param db: AsyncSession: Pass in the database connection
     :param tag_name: str: Specify the name of the tag that we want to create or retrieve
     :return: A tag object
     """
-    query = select(Tag).where(Tag.tagname == tag_name)
-    existing_tag = await db.execute(query)
-    tag = existing_tag.scalar_one_or_none()
-
-    if not tag:
-        tag = Tag(tagname=tag_name)
-        db.add(tag)
-        await db.commit()
-        return tag
-
+    stmt = insert(Tag).values(tagname=tag_name)
+    stmt = stmt.on_conflict_do_update(index_elements=[Tag.tagname], set_={"tagname": stmt.excluded.tagname}).returning(Tag)
+    result = await db.execute(stmt)
+    tag = result.scalar_one()
     return tag
 
 
@@ -173,6 +170,7 @@ async def get_qrcode(picture_id: int, db: AsyncSession):
     """
     The get_qrcode function takes in a picture_id and returns the qrcode for that picture.
         If no such picture exists, it returns None.
+        Generating the qrcode downloads the picture, so it runs in a worker thread.
 
     :param picture_id: int: Specify the id of the picture
     :param db: AsyncSession: Pass the database session into the function
@@ -186,7 +184,7 @@ async def get_qrcode(picture_id: int, db: AsyncSession):
     if result is None:
         return None
 
-    return qrcode_generator.generate_qrcode(result.picture_url)
+    return await asyncio.to_thread(qrcode_generator.generate_qrcode, result.picture_url)
 
 
 async def retrieve_tags_for_picture(picture_id: int, db: AsyncSession):
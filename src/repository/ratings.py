@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, select, update
 
 from src.database.models import User, Rating, Picture
 from src.conf.messages import messages
@@ -63,20 +63,24 @@ async def calculate_average_rating(picture_id: int, db: AsyncSession) -> float |
     return rating
 
 
-async def picture_ratings(picture_id: int, db: AsyncSession):
+async def picture_ratings(picture_id: int, db: AsyncSession) -> float | None:
     """
-    The picture_ratings function takes in a picture_id and returns the ratings for that picture.
+    The picture_ratings function takes in a picture_id and returns the average rating of that picture.
+    The average is kept up to date in the rating_average column whenever a rating is added or removed, so only that
+    column is selected instead of loading the picture together with its user.
         Args:
             picture_id (int): The id of the desired picture.
 
     :param picture_id: int: Specify the picture id of the picture that is being rated
     :param db: AsyncSession: Pass the database connection to the function
-    :return: A picture object
+    :return: The average rating or none if there is no picture with that id
     """
-    query = select(Picture).where(Picture.id == picture_id)
+    query = select(Picture.id, Picture.rating_average).where(Picture.id == picture_id)
     result = await db.execute(query)
-    picture = result.scalar_one_or_none()
-    return picture
+    picture = result.first()
+    if picture is None:
+        return None
+    return picture.rating_average or 0.0
 
 
 async def remove_rating(
@@ -88,18 +92,26 @@ async def remove_rating(
     Remove a rating from the database.
 
     This function removes a rating associated with a specific picture and user from the database.
+    It runs a single DELETE ... RETURNING statement, so the rating is not loaded before it is deleted.
+    The picture's rating_average is recalculated in the same transaction, so it stays up to date.
 
     :param picture_id: int: The ID of the picture that was rated.
     :param user_id: int: The ID of the user who rated the picture.
     :param db: AsyncSession: The database session used for database operations.
 
-    :return: Rating: The removed rating object.
+    :return: int | None: The ID of the removed rating, or None if there was no such rating.
     """
-    query = await db.execute(select(Rating).where((Rating.user_id == user_id) & (Rating.picture_id == picture_id)))
-    rating = query.scalar()
-    if not rating:
-        return None
-
-    await db.delete(rating)
-    await db.commit()
-    return rating
+    stmt = delete(Rating).where((Rating.user_id == user_id) & (Rating.picture_id == picture_id)).returning(Rating.id)
+    try:
+        result = await db.execute(stmt)
+        deleted_id = result.scalars().first()
+        if deleted_id is not None:
+            average_rating = await calculate_average_rating(picture_id, db)
+            await db.execute(
+                update(Picture).where(Picture.id == picture_id).values(rating_average=average_rating or 0.0)
+            )
+        await db.commit()
+        return deleted_id
+    except Exception as e:
+        await db.rollback()
+        raise e
@@ -1,8 +1,67 @@
+import time
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import select
+from sqlalchemy.sql import delete, select, update
 
+from src.conf.constant import TAG_CACHE_SIZE, TAG_CACHE_TTL
 from src.database.models import Picture, Tag
-from src.schemas.tags import TagModel, TagResponse
+
+_tags_by_id: dict[int, tuple[float, Tag]] = {}
+_tags_by_tagname: dict[str, tuple[float, Tag]] = {}
+
+
+def _get_cached_tag(cache: dict, key) -> Tag | None:
+    """
+    The _get_cached_tag function returns a tag from the cache if it is there and has not expired yet.
+
+    :param cache: dict: The cache to look in
+    :param key: The id or tagname of the tag
+    :return: A tag object or none
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    expires_at, tag = entry
+    if expires_at < time.monotonic():
+        cache.pop(key, None)
+        return None
+    return tag
+
+
+def _cache_tag(tag: Tag) -> None:
+    """
+    The _cache_tag function stores a tag in the cache under both its id and its tagname.
+
+    :param tag: Tag: The tag to cache
+    :return: None
+    """
+    if len(_tags_by_id) >= TAG_CACHE_SIZE:
+        clear_tag_cache()
+    entry = (time.monotonic() + TAG_CACHE_TTL, tag)
+    _tags_by_id[tag.id] = entry
+    _tags_by_tagname[tag.tagname] = entry
+
+
+def forget_tag(tag_id: int) -> None:
+    """
+    The forget_tag function removes a tag from the cache. It is called whenever a tag is renamed or removed.
+
+    :param tag_id: int: The id of the tag
+    :return: None
+    """
+    entry = _tags_by_id.pop(tag_id, None)
+    if entry is not None:
+        _tags_by_tagname.pop(entry[1].tagname, None)
+
+
+def clear_tag_cache() -> None:
+    """
+    The clear_tag_cache function removes all tags from the cache.
+
+    :return: None
+    """
+    _tags_by_id.clear()
+    _tags_by_tagname.clear()
 
 
 async def get_tags(db: AsyncSession):
@@ -24,16 +83,22 @@ async def get_tag_by_id(tag_id: int, db: AsyncSession):
     """
     The get_tag_by_id function takes in a tag_id and an AsyncSession object.
     It then uses the AsyncSession to query the database for a Tag with that id.
-    If it finds one, it returns that Tag as an object.
+    If it finds one, it returns that Tag as an object. Found tags are cached in process for TAG_CACHE_TTL seconds.
 
     :param tag_id: int: Specify the id of the tag we want to retrieve from our database
     :param db: AsyncSession: Pass the database session into the function
     :return: A tag object
     :doc-author: Trelent
     """
+    cached_tag = _get_cached_tag(_tags_by_id, tag_id)
+    if cached_tag is not None:
+        return cached_tag
+
     query = select(Tag).filter(Tag.id == tag_id)
     tag = await db.execute(query)
     result = tag.scalar()
+    if result is not None:
+        _cache_tag(result)
     return result
 
 
@@ -41,55 +106,68 @@ async def get_tag_by_tagname(tagname: str, db: AsyncSession):
     """
     The get_tag_by_tagname function takes in a tagname and an AsyncSession object.
     It then queries the database for a Tag with that tagname, and returns it as a
-    TagModel object.
+    TagModel object. Found tags are cached in process for TAG_CACHE_TTL seconds.
 
     :param tagname: str: Filter the query by tagname
     :param db: AsyncSession: Pass the database session to the function
     :return: A tag object that has the given tagname
     :doc-author: Trelent
     """
+    cached_tag = _get_cached_tag(_tags_by_tagname, tagname)
+    if cached_tag is not None:
+        return cached_tag
+
     query = select(Tag).filter(Tag.tagname == tagname)
     tag = await db.execute(query)
     result = tag.scalar()
+    if result is not None:
+        _cache_tag(result)
     return result
 
 
-async def update_tag(tag_id: int, body: TagModel, db: AsyncSession):
+async def rename_tag(tag_id: int, tagname: str, db: AsyncSession) -> Tag | None:
     """
-    The update_tag function takes in a tag_id, body, and db.
-        It then gets the tag by id from the database. If it exists,
-        it updates the tagname to what is passed in through body.
+    The rename_tag function takes in a tag_id, a new tagname and db.
+        It renames the tag with a single UPDATE ... RETURNING statement.
+        If the new tagname is already taken, the unique constraint on tagname raises an IntegrityError.
 
     :param tag_id: int: Get the tag by id
-    :param body: TagModel: Pass in the new tagname to update the tag with
+    :param tagname: str: The new tagname
     :param db: AsyncSession: Create a database connection to the postgres database
-    :return: A tagresponse object
-    :doc-author: Trelent
+    :return: The renamed tag or none if there is no tag with that id
     """
-    tag = await get_tag_by_id(tag_id, db)
-
-    if tag:
-        tag.tagname = body.tagname
-
-        tag_response = TagResponse(id=tag.id, tagname=tag.tagname, created_at=tag.created_at, updated_at=tag.updated_at)
-
-        return tag_response
+    stmt = update(Tag).where(Tag.id == tag_id).values(tagname=tagname).returning(Tag)
+    try:
+        result = await db.execute(stmt)
+        tag = result.scalar_one_or_none()
+        await db.commit()
+        forget_tag(tag_id)
+        return tag
+    except Exception as e:
+        await db.rollback()
+        raise e
 
 
 async def remove_tag(tag_id: int, db: AsyncSession):
     """
     The remove_tag function removes a tag from the database.
+    It runs a single DELETE ... RETURNING statement; the links to pictures are removed by the database cascade.
 
     :param tag_id: int: Specify the id of the tag to be removed
     :param db: AsyncSession: Pass the database session to the function
-    :return: The tag that was removed
+    :return: The id of the removed tag or none if there is no tag with that id
     :doc-author: Trelent
     """
-    tag = await get_tag_by_id(tag_id, db)
-
-    if tag:
-        await db.delete(tag)
+    stmt = delete(Tag).where(Tag.id == tag_id).returning(Tag.id)
+    try:
+        result = await db.execute(stmt)
+        deleted_id = result.scalar_one_or_none()
         await db.commit()
+        forget_tag(tag_id)
+        return deleted_id
+    except Exception as e:
+        await db.rollback()
+        raise e
 
 
 
@@ -1,9 +1,11 @@
+import hashlib
+from functools import lru_cache
 
 from fastapi import UploadFile
-from libgravatar import Gravatar
-from sqlalchemy import func, select,  outerjoin
+from sqlalchemy import exists, func, select, update,  outerjoin
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 from sqlalchemy.orm.exc import NoResultFound
 
 from src.database.models import Comment, InvalidToken, Picture, Role, User
@@ -11,6 +13,8 @@ from src.schemas.filters import UserFilter
 from src.schemas.users import UserModel, UserProfile
 from src.services.cloud_picture import CloudPicture
 
+_admin_exists: bool = False
+
 
 async def get_user_by_email(email: str, db: AsyncSession) -> User | None:
     """
@@ -34,32 +38,46 @@ async def get_user_by_email(email: str, db: AsyncSession) -> User | None:
     return user
 
 
+@lru_cache(maxsize=1024)
+def get_gravatar_url(email: str) -> str:
+    """
+    The get_gravatar_url function builds the Gravatar avatar url for an email address.
+    Gravatar urls are derived from the md5 hash of the normalized email, so no request to Gravatar.com is needed.
+
+    :param email: str: The email address of the user
+    :return: The url of the user's Gravatar image
+    """
+    email_hash = hashlib.md5(email.strip().lower().encode("utf-8")).hexdigest()
+    return f"https://www.gravatar.com/avatar/{email_hash}"
+
+
 async def create_user(body: UserModel, db: AsyncSession) -> User:
     """
     The create_user function takes a UserModel object and a database session as arguments.
-    It then creates an instance of the Gravatar class, passing in the user's email address.
-    The get_image() method is called on this instance to retrieve the user's avatar image from Gravatar.com,
-    and it is assigned to the avatar variable. The model_dump() method of UserModel returns a dictionary containing all
+    It then builds the user's Gravatar avatar url from the email address and assigns it to the avatar variable.
+    The model_dump() method of UserModel returns a dictionary containing all
     the fields that are required for creating an instance of User (except for id). This dictionary is unpacked into
     keyword arguments for creating new_user using Python's ** operator.
+    The very first user becomes an admin. Once any user exists this is remembered, so later signups skip the check.
 
     :param body: UserModel: Create a new user
     :param db: AsyncSession: Pass the database session to the function
     :return: A user object
     """
-    g = Gravatar(body.email)
-    avatar = g.get_image()
+    avatar = get_gravatar_url(body.email)
 
-    existing_user = (await db.execute(select(User).limit(1))).scalar()
+    global _admin_exists
+    if not _admin_exists:
+        _admin_exists = bool(await db.scalar(select(exists().where(User.id.is_not(None)))))
 
-    if existing_user is None:
+    if not _admin_exists:
         new_user = User(**body.model_dump(), avatar=avatar, roles="admin")
     else:
         new_user = User(**body.model_dump(), avatar=avatar)
 
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
+    _admin_exists = True
     return new_user
 
 
@@ -77,57 +95,84 @@ async def update_token(user: User, refresh_token: str | None, db: AsyncSession)
         await db.commit()
 
 
+async def update_user_by_email(email: str, db: AsyncSession, **values) -> User | None:
+    """
+    The update_user_by_email function sets the given fields on the user with the given email address.
+    It runs a single UPDATE ... RETURNING statement, so the user is not loaded before it is changed.
+
+    :param email: str: Specify the email address of the user to be updated
+    :param db: AsyncSession: Pass in the database session
+    :param values: The fields to set and their new values
+    :return: The updated user or none if there is no user with that email
+    """
+    stmt = update(User).where(User.email == email).values(**values).returning(User)
+    try:
+        result = await db.execute(stmt)
+        user = result.scalar_one_or_none()
+        await db.commit()
+        return user
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
 async def confirmed_email(email: str, db: AsyncSession) -> None:
     """
     The confirmed_email function takes an email address and a database session as arguments.
-    It then queries the database for a user with that email address, and sets their confirmed field to True.
-    Finally, it commits the change to the database.
+    It then sets the confirmed field of the user with that email address to True and commits the change to the database.
 
     :param email: str: Specify the email address of the user to be confirmed
     :param db: AsyncSession: Pass in the database session
     :return: None
     """
-    user = await get_user_by_email(email, db)
-    if user:
-        user.confirmed = True
-        await db.commit()
+    await update_user_by_email(email, db, confirmed=True)
 
 
 async def edit_my_profile(email: str, file: UploadFile, name: str, db: AsyncSession) -> User | None:
     """
     The edit_my_profile function takes in an email, a file, and a name.
-    It then gets the user by their email from the database. If there is no user with that email, it returns None.
-    If there is a user with that given email address, it sets their username to be equal to the name parameter if one was
-    provided.
-    Then it initializes cloudinary and uploads the file using cloudinary's uploader module (which uses Cloudinary's API).
-    The public_id of this image will be &quot;avatar/{user's username}&quot;. This means that all images uploaded for each
-    individual avatar will have unique
+    The new username is written with a single UPDATE ... RETURNING statement. The statement only matches when no other
+    user already has that username, so checking the name and saving it is one round trip.
+    Only once the user is known to exist and the name is saved, the file is uploaded using cloudinary's uploader
+    module (which uses Cloudinary's API) into the folder of the user's username, and the new avatar url is saved with
+    a second UPDATE. The spooled upload file is passed as is, and large files are sent in chunks, so the whole file is
+    never held in memory at once.
 
     :param email: str: Get the user from the database
     :param file: UploadFile: Upload the file to cloudinary
     :param name: str: Change the username of the user
     :param db: AsyncSession: Pass the database session to the function
-    :return: A user object if the user exists and none otherwise
+    :return: The updated user, or none if there is no user with that email or the name is taken
     """
-    user = await get_user_by_email(email, db)
-    if user:
-        if name:
-            user.username = name
-        if file:
-            init_cloudinary = CloudPicture()
-            public_id = init_cloudinary.generate_folder_name(user.username)
-            file_info = init_cloudinary.upload_picture(file.file, public_id)
-            src_url = init_cloudinary.get_url_for_picture(public_id, file_info)
-
-            user.avatar = src_url
+    if name:
+        other = aliased(User)
+        stmt = (
+            update(User)
+            .where(User.email == email, ~exists().where(other.username == name, other.email != email))
+            .values(username=name)
+            .returning(User)
+        )
         try:
+            result = await db.execute(stmt)
+            user = result.scalar_one_or_none()
             await db.commit()
-            await db.refresh(user)
-            return user
+        except IntegrityError:
+            await db.rollback()
+            return None
         except Exception as e:
             await db.rollback()
             raise e
-    return None
+    else:
+        user = await get_user_by_email(email, db)
+
+    if user is None:
+        return None
+
+    if file:
+        public_id = CloudPicture.generate_folder_name(user.username)
+        file_info = await CloudPicture.upload_picture(file.file, public_id)
+        user = await update_user_by_email(email, db, avatar=CloudPicture.get_url_for_picture(public_id, file_info))
+    return user
 
 
 async def change_password(user: User, password: str, db: AsyncSession) -> User:
@@ -169,90 +214,94 @@ async def get_user_username(username: str, db: AsyncSession) -> User | None:
         return None
 
 
-async def get_user_profile(user: User, db: AsyncSession):
+async def get_all_users(after_id: int | None, limit: int, db: AsyncSession) -> list[User]:
     """
-    The get_user_profile function is used to get a user's profile.
-        Args:
-            user (User): The User object that we want to get the profile for.
-            db (AsyncSession): The database session that will be used for querying the database.
-    
-    :param user: User: Pass the user object to the function
+    The get_all_users function returns a page of users ordered by id.
+    It uses keyset pagination: the page starts right after the user with id after_id, so Postgres
+    reads only limit rows from the primary key index no matter how deep the page is.
+
+    :param after_id: int | None: The id of the last user of the previous page, none for the first page
+    :param limit: int: The number of users to return
     :param db: AsyncSession: Pass the database session to the function
-    
-    :return: A userprofile object
+    :return: A list of users
     """
+    query = (
+        select(User)
+        .options(selectinload(User.pictures))
+        .options(selectinload(User.comments_user))
+        .order_by(User.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        query = query.where(User.id > after_id)
 
-    if user:
-        pictures = select(func.count()).where(Picture.user_id == user.id)
-        pictures_result = await db.execute(pictures)
-        pictures_count = pictures_result.scalar()
-
-        comments = select(func.count()).where(Comment.user_id == user.id)
-        comments_result = await db.execute(comments)
-        comments_count = comments_result.scalar()
-
-        user_profile = UserProfile(
-            id=user.id,
-            roles=user.roles,
-            username=user.username,
-            email=user.email,
-            avatar=user.avatar,
-            is_active=user.is_active,
-            pictures_count=pictures_count,
-            comments_count=comments_count,
-            confirmed=user.confirmed,
-            created_at=user.created_at,
-            updated_at=user.created_at
-        )
-        return user_profile
-    return None
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def get_user_profile_by_username(username: str, db: AsyncSession) -> UserProfile | None:
+    """
+    The get_user_profile_by_username function gets the profile of the user with the given username.
+    The user and the counts of their pictures and comments are read in a single query.
+    The values come straight from the database, so the profile is constructed without validation.
+
+    :param username: str: The username of the user
+    :param db: AsyncSession: Pass the database session to the function
+    :return: A userprofile object or none if there is no user with that username
+    """
+    pictures = select(func.count(Picture.id)).where(Picture.user_id == User.id).scalar_subquery()
+    comments = select(func.count(Comment.id)).where(Comment.user_id == User.id).scalar_subquery()
+    query = select(User, pictures, comments).where(User.username == username)
+    row = (await db.execute(query)).one_or_none()
+    if row is None:
+        return None
+
+    user, pictures_count, comments_count = row
+    return UserProfile.model_construct(
+        id=user.id,
+        roles=user.roles,
+        username=user.username,
+        email=user.email,
+        avatar=user.avatar,
+        is_active=user.is_active,
+        pictures_count=pictures_count,
+        comments_count=comments_count,
+        confirmed=user.confirmed,
+        created_at=user.created_at,
+        updated_at=user.updated_at
+    )
 
 
 async def ban_user(email: str, db: AsyncSession) -> User | None:
-    user = await get_user_by_email(email, db)
-    if user:
-        user.is_active = False
+    """
+    The ban_user function takes an email and a database session as arguments.
+    It sets the is_active attribute of the user with that email address to False and returns the updated user object.
 
-        try:
-            await db.commit()
-            await db.refresh(user)
-            return user
-        except Exception as e:
-            await db.rollback()
-            raise e
-    return None
+    :param email: Find the user in the database
+    :param db: AsyncSession: Pass in the database session
+    :return: A user or none
+    """
+    return await update_user_by_email(email, db, is_active=False)
 
 
 async def activate_user(email: str, db: AsyncSession) -> User | None:
     """
     The activate_user function takes an email and a database session as arguments.
-    It then queries the database for a user with that email address, and if it finds one,
-    it sets its is_active attribute to True. It then commits the change to the database
+    It sets the is_active attribute of the user with that email address to True, commits the change to the database
     and returns the updated user object.
 
     :param email: Find the user in the database
     :param db: AsyncSession: Pass in the database session so that we can use it to query the database
     :return: A user or none
     """
-    user = await get_user_by_email(email, db)
-    if user:
-        user.is_active = True
-
-        try:
-            await db.commit()
-            await db.refresh(user)
-            return user
-        except Exception as e:
-            await db.rollback()
-            raise e
-    return None
+    return await update_user_by_email(email, db, is_active=True)
 
 
 async def invalidate_token(token: str, db: AsyncSession) -> None:
     """
     The invalidate_token function takes a token and an AsyncSession object as arguments.
-    It creates an InvalidToken object with the given token, adds it to the database, commits
-    the changes to the database, and refreshes invalid_token. If any of these steps fail for
+    It creates an InvalidToken object with the given token, adds it to the database and commits
+    the changes to the database. If any of these steps fail for
     any reason (e.g., if there is already a row in the invalid_tokens table with that token),
     then all of them are rolled back.
 
@@ -264,7 +313,6 @@ async def invalidate_token(token: str, db: AsyncSession) -> None:
     try:
         db.add(invalid_token)
         await db.commit()
-        await db.refresh(invalid_token)
     except Exception as e:
         await db.rollback()
         raise e
@@ -307,7 +355,6 @@ async def change_role(email: str, role: Role, db: AsyncSession) -> User | None:
 
         try:
             await db.commit()
-            await db.refresh(user)
             return user
         except Exception as e:
             await db.rollback()
@@ -315,6 +362,16 @@ async def change_role(email: str, role: Role, db: AsyncSession) -> User | None:
     return None
 
 
+# Select statements are immutable, so the base query is built once and every search derives its own from it
+_SEARCH_USERS_QUERY = (
+    select(User)
+    .select_from(outerjoin(User, Comment))
+    .options(selectinload(User.pictures))
+    .options(selectinload(User.comments_user))
+    .options(selectinload(User.ratings))
+)
+
+
 async def search_users(user_filter: UserFilter, db: AsyncSession):
     """
     The search_users function takes in a UserFilter object and an AsyncSession object.
@@ -327,15 +384,7 @@ async def search_users(user_filter: UserFilter, db: AsyncSession):
     :return: A list of users
     """
 
-    query = (
-        select(User)
-        .select_from(outerjoin(User, Comment))
-        .options(selectinload(User.pictures))
-        .options(selectinload(User.comments_user))
-        .options(selectinload(User.ratings))
-      
-    )
-    query = user_filter.filter(query)
+    query = user_filter.filter(_SEARCH_USERS_QUERY)
 
     query = user_filter.sort(query)
     result = (await db.execute(query)).unique()
@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordRequestForm
 from redis.asyncio import Redis
@@ -43,7 +45,7 @@ async def signup(
     if exist_user_email:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=messages.get_message("ACCOUNT_ALREADY_EXISTS"))
 
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await asyncio.to_thread(auth_service.get_password_hash, body.password)
     new_user = await repository_users.create_user(body, db)
 
     subject = "Confirm your email! "
@@ -73,7 +75,7 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.get_message("USER_IS_ON_BAN_LIST"))
 
-    if not auth_service.verify_password(body.password, user.password):
+    if not await asyncio.to_thread(auth_service.verify_password, body.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.get_message("INVALID_PASSWORD"))
 
     access_token: str = await auth_service.create_access_token(data={"sub": user.email})
@@ -243,7 +245,7 @@ async def reset_password(new_password: str, token: str, db: AsyncSession = Depen
     if user is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.get_message("VERIFICATION_ERROR"))
 
-    confirm_password = auth_service.get_password_hash(new_password)
+    confirm_password = await asyncio.to_thread(auth_service.get_password_hash, new_password)
     user = await repository_users.change_password(user, confirm_password, db)
 
     return {"user": user, "detail": messages.get_message("PASSWORD_RESET_COMPLETE")}
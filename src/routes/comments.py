@@ -1,12 +1,13 @@
-from typing import List
+from datetime import datetime
+from typing import Dict, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
-from src.schemas.comments import CommentCreate, CommentDB, CommentUpdate
+from src.schemas.comments import CommentCreate, CommentDB, CommentUpdate, PicturesCommentsRequest
 from src.services.roles import admin_moderator_user, admin_moderator
 from src.repository import comments as repository_comments
-from src.services.auth import auth_service
+from src.services.auth import auth_service, profile_cache_key
 from src.database.models import User
 from src.conf.messages import messages
 
@@ -37,6 +38,7 @@ async def create_comment(
     comment = await repository_comments.create_comment(body, picture_id, current_user.id, db)
     if comment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("COMMENT_NOT_CREATED"))
+    await auth_service.forget_user(f"user:{current_user.email}", profile_cache_key(current_user.username))
     return comment
 
 
@@ -69,6 +71,7 @@ async def update_comment(
     comment = await repository_comments.update_comment(picture_id, comment_id, body, current_user.id, db)
     if comment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("COMMENT_NOT_CREATED"))
+    await auth_service.forget_user(f"user:{current_user.email}", profile_cache_key(current_user.username))
     return comment
 
 
@@ -94,8 +97,9 @@ async def remove_comment(
 
     :return: A 204 status code
     """
-    comment = await repository_comments.delete_comment(comment_id, picture_id, db)
-    return comment
+    deleted_id = await repository_comments.delete_comment(comment_id, picture_id, db)
+    if deleted_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("COMMENT_NOT_FOUND"))
 
 
 @router.get(
@@ -108,21 +112,47 @@ async def comments_to_picture(
     picture_id: int,
     skip: int = 0,
     limit: int = 10,
+    since: datetime | None = None,
     db: AsyncSession = Depends(get_db),
 ):
     """
     The comments_to_picture function returns a list of comments to the picture with the given picture_id.
     The skip and limit parameters are used for pagination, where skip is how many comments to skip and limit is how many
     comments to return.
+    With since, only comments created after that moment are returned, and an empty list means there is nothing new.
 
     :param picture_id: int: Get the comments to a specific picture
     :param skip: int: Skip the first n comments
     :param limit: int: Limit the number of comments returned
+    :param since: datetime | None: Return only comments created after this moment
     :param db: AsyncSession: Get the database session
     :return: A list of comments to a picture
     """
 
-    comments = await repository_comments.get_comments_to_picture(skip, limit, picture_id, db)
-    if not comments:
+    comments = await repository_comments.get_comments_to_picture(skip, limit, picture_id, db, since)
+    if not comments and since is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("COMMENTS_NOT_FOUND"))
     return comments
+
+
+@router.post(
+    "/comments/batch",
+    response_model=Dict[int, List[CommentDB]],
+    dependencies=[Depends(admin_moderator_user)],
+    description="User, Moderator and Administrator have access",
+)
+async def comments_to_pictures(
+    body: PicturesCommentsRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    The comments_to_pictures function returns the comments of several pictures at once.
+    It lets a feed load the comments of all its pictures with one request and one database query.
+
+    :param body: PicturesCommentsRequest: The ids of the pictures
+    :param db: AsyncSession: Get the database session
+    :return: A dict that maps each picture id to its comments
+    """
+
+    comments = await repository_comments.get_comments_for_pictures(body.picture_ids, db)
+    return comments
@@ -11,7 +11,7 @@ from src.schemas.pictures import (PictureDescrUpdate, PictureNameUpdate,
                                   PictureResponse, PictureTransform,
                                   PictureUpload)
 from src.schemas.tags import TagResponse
-from src.services.auth import auth_service
+from src.services.auth import auth_service, profile_cache_key
 from src.services.cloud_picture import CloudPicture
 from src.services.roles import admin_moderator_user, admin_moderator
 from src.conf.messages import messages
@@ -56,7 +56,7 @@ async def upload_picture_to_cloudinary(
         "effect": transf.effect.value,
     }
     try:
-        info_file = CloudPicture.upload_picture(file.file, public_id, transformation)
+        info_file = await CloudPicture.upload_picture(file.file, public_id, transformation)
         picture_url = CloudPicture.get_url_for_picture(public_id, info_file)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{e}")
@@ -72,6 +72,7 @@ async def upload_picture_to_cloudinary(
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.get_message("THE_LENGTH_OF_TAGS_SHOULD_NOT_EXCEED_25"))
 
     picture_data = await repository_pictures.save_data_of_picture_to_db(body, picture_url, current_user, db, tag_names=tag_names)
+    await auth_service.forget_user(f"user:{current_user.email}", profile_cache_key(current_user.username))
     return {
         "picture": picture_data,
         "detail": messages.get_message("PICTURE_WAS_UPLOADED_TO_SERVER"),
@@ -105,6 +106,7 @@ async def update_name_of_picture(
     updated_name = await repository_pictures.update_picture_name(picture_id, body, current_user.id, db)
     if updated_name is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("COMMENT_HAS_NOT_BEEN_UPDATED"))
+    await auth_service.forget_user(f"user:{current_user.email}", profile_cache_key(current_user.username))
     return updated_name
 
 
@@ -138,6 +140,7 @@ async def update_description_of_picture(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=messages.get_message("DESCRIPTION_HAS_NOT_BEEN_UPDATED"),
         )
+    await auth_service.forget_user(f"user:{current_user.email}", profile_cache_key(current_user.username))
     return updated_descr
 
 
@@ -205,6 +208,7 @@ async def delete_picture(
     if picture is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("PICTURE_NOT_FOUND"))
 
+    await auth_service.forget_user(f"user:{current_user.email}", profile_cache_key(current_user.username))
     return picture
 
 
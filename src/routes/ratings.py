@@ -33,6 +33,7 @@ async def create_picture_rating(
     if not (1 <= rating <= 5):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.get_message("RATING_MUST_BE_1_TO_5"))
     rating_picture = await repository_rating.create_picture_rating(picture_id, rating, current_user, db)
+    await auth_service.forget_user(f"user:{current_user.email}")
 
     return {"rating": rating_picture, "detail": messages.get_message("RATING_SUCCESSFULLY_ADDED")}
 
@@ -40,17 +41,17 @@ async def create_picture_rating(
 @router.get("{picture_id}/ratings", dependencies=[Depends(admin_moderator_user)], response_model=AverageRatingResponse)
 async def picture_ratings(picture_id: int, db: AsyncSession = Depends(get_db)):
     """
-    The picture_ratings function returns a list of ratings for the picture with the given id.
+    The picture_ratings function returns the average rating of the picture with the given id.
         If no such picture exists, it raises an HTTPException with status code 404 and detail &quot;Picture not found!&quot;.
 
     :param picture_id: int: Get the picture id from the url
     :param db: AsyncSession: Pass the database connection to the function
-    :return: A list of ratings for a picture
+    :return: The average rating of a picture
     """
-    picture = await repository_rating.picture_ratings(picture_id, db)
-    if not picture:
+    rating_average = await repository_rating.picture_ratings(picture_id, db)
+    if rating_average is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("PICTURE_NOT_FOUND"))
-    return picture
+    return {"rating_average": rating_average}
 
 
 @router.delete("{picture_id}/ratings_delete", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(admin)])
@@ -61,16 +62,15 @@ async def remove_photo_rating(
 ):
     """
     The remove_photo_rating function is used to remove a rating from the database.
-        It takes in a picture_id and user_id as parameters, and returns the deleted rating.
+        It takes in a picture_id and user_id as parameters.
 
     :param picture_id: int: Get the picture id of the photo that is being rated
     :param user_id: int: Identify the user who is rating the photo
     :param db: AsyncSession: Get the database connection
 
-    :return: The deleted rating
+    :return: A 204 status code
     """
 
-    deleted_rating = await repository_rating.remove_rating(picture_id, user_id, db)
-    if not deleted_rating:
+    deleted_id = await repository_rating.remove_rating(picture_id, user_id, db)
+    if deleted_id is None:
         raise HTTPException(status_code=400, detail=messages.get_message("UNABLE_DELETE_RATING"))
-    return deleted_rating
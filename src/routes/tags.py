@@ -1,6 +1,7 @@
 from typing import List
 
 from fastapi import APIRouter, HTTPException, status, Depends
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repository import tags as repository_tags
@@ -58,16 +59,14 @@ async def update_tag(tag_id: int, body: TagModel, db: AsyncSession = Depends(get
     :return: The updated tag, if the tagname does not exist it will return an error
     :doc-author: Trelent
     """
-    tag = await repository_tags.get_tag_by_id(tag_id, db)
-    exist_tag = await repository_tags.get_tag_by_tagname(str(body.tagname), db)
-
-    if tag:
-        if exist_tag is None:
-            updated_tag = await repository_tags.update_tag(tag_id, body, db)
-            return updated_tag
+    try:
+        updated_tag = await repository_tags.rename_tag(tag_id, body.tagname, db)
+    except IntegrityError:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=messages.get_message("TAGNAME_ALREADY_EXIST"))
-    else:
+
+    if updated_tag is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("TAGNAME_NOT_FOUND"))
+    return updated_tag
 
 
 @router.delete("/{tag_id}", dependencies=[Depends(admin_moderator)], status_code=status.HTTP_204_NO_CONTENT)
@@ -81,9 +80,6 @@ async def delete_tag(tag_id: int, db: AsyncSession = Depends(get_db)):
     :return: A boolean value
     :doc-author: Trelent
     """
-    tag = await repository_tags.get_tag_by_id(tag_id, db)
-    if tag is None:
+    deleted_id = await repository_tags.remove_tag(tag_id, db)
+    if deleted_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("TAGNAME_NOT_FOUND"))
-
-    result = await repository_tags.remove_tag(tag_id, db)
-    return result
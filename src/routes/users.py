@@ -1,36 +1,66 @@
+import hashlib
 from typing import List
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import RedirectResponse
 from fastapi_filter import FilterDepends
+from pydantic import ValidationError
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.conf.config import init_async_redis
+from src.conf.constant import PROFILE_CACHE_TTL
 from src.database.db import get_db
 from src.database.models import Role, User
 from src.repository import users as repository_users
 from src.schemas.comments import CommentDB
-from src.schemas.filters import UserFilter, UserOut
+from src.schemas.filters import UserFilter, UserOut, UsersPage
 from src.schemas.users import Action, UserDb, UserInfo, UserProfile, UserResponse
-from src.services.auth import auth_service
+from src.services.auth import auth_service, profile_cache_key
 from src.services.roles import admin, admin_moderator, admin_moderator_user
 from src.conf.messages import messages
 
 router = APIRouter(tags=["users"])
 
+PROFILE_CACHE_CONTROL = "private, max-age=60"
+AVATAR_CACHE_CONTROL = "private, max-age=60"
+
+_MSG_USER_NOT_FOUND = messages.get_message("USER_NOT_FOUND")
+_MSG_YOU_CANT_BAN_YOURSELF = messages.get_message("YOU_CANT_BAN_YOURSELF")
+_MSG_USER_HAS_ALREADY_BANNED = messages.get_message("USER_HAS_ALREADY_BANNED")
+_MSG_USER_ALREADY_ACTIVATED = messages.get_message("USER_ALREADY_ACTIVATED")
+_MSG_NEW_ROLE_MUST_BE_SPECIFIED = messages.get_message("NEW_ROLE_MUST_BE_SPECIFIED_FOR_CHANGING_ROLE")
+_MSG_INVALID_ACTION_SPECIFIED = messages.get_message("INVALID_ACTION_SPECIFIED")
+
+_BAN_TMPL = "{username} " + messages.get_message("USER_HAS_BEEN_BANNED")
+_ACTIVATE_TMPL = "{username} " + messages.get_message("USER_HAS_BEEN_ACTIVATED")
+_CHANGE_ROLE_TMPL = messages.get_message("USERS_ROLE_HAS_BEEN_CHANGED_TO") + " {role}"
+
+
+def profile_etag(profile: UserProfile) -> str:
+    """
+    The profile_etag function builds an ETag for a user's profile.
+    The tag changes whenever the user row or the number of the user's pictures or comments changes.
+
+    :param profile: UserProfile: The profile the tag is built for
+    :return: A quoted ETag value
+    """
+    updated_at = profile.updated_at.timestamp() if profile.updated_at else ""
+    version = f"{profile.id}:{updated_at}:{profile.pictures_count}:{profile.comments_count}"
+    return f'"{hashlib.md5(version.encode()).hexdigest()}"'
+
 
 @router.get("/me", response_model=UserInfo)
-async def read_users_me(
-    current_user: User = Depends(auth_service.get_current_user), redis_client: Redis = Depends(init_async_redis)
-) -> User:
+async def read_users_me(current_user: User = Depends(auth_service.get_current_user)) -> User:
     """
     The read_users_me function is a GET endpoint that returns the current user's information.
+    The user comes from the Redis cache kept by auth_service, which routes changing the user clear,
+    so a read costs no database query.
 
     :param current_user: User: Get the current user from the database
     :return: The current user object
     """
 
-    key_to_clear = f"user:{current_user.email}"
-    await redis_client.delete(key_to_clear)
     return current_user
 
 
@@ -51,14 +81,18 @@ async def edit_my_profile(
 
     :return: A dictionary with the user and a message
     """
-    
-    user_exist = await repository_users.get_user_username(name, db)
-
-    if user_exist:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.get_message("USER_WITH_THIS_NAME_ALREADY_EXISTS"))
 
     user = await repository_users.edit_my_profile(current_user.email, file, name, db)
 
+    if user is None:
+        if await repository_users.get_user_username(name, db):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.get_message("USER_WITH_THIS_NAME_ALREADY_EXISTS"))
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=_MSG_USER_NOT_FOUND)
+
+    await auth_service.forget_user(
+        f"user:{current_user.email}", profile_cache_key(current_user.username), profile_cache_key(name)
+    )
+
     return {"user": user, "detail": messages.get_message("MY_PROFILE_WAS_SUCCESSFULLY_EDITED")}
 
 
@@ -80,26 +114,182 @@ async def search_users(
 
 
 
-@router.get("/{username}", dependencies=[Depends(admin_moderator)], response_model=UserProfile)
+@router.get("/all", dependencies=[Depends(admin_moderator)], response_model=UsersPage)
+async def get_all_users(
+    after_id: int | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """
+    The get_all_users function returns a page of all users ordered by id.
+    To get the next page pass the returned next_after_id as after_id.
+
+    :param after_id: int | None: The cursor returned with the previous page
+    :param limit: int: The number of users on a page
+    :param db: AsyncSession: Get the database session
+    :return: A dict with the users and the cursor of the next page
+    """
+
+    users = await repository_users.get_all_users(after_id, limit, db)
+    next_after_id = users[-1].id if len(users) == limit else None
+    return {"users": users, "next_after_id": next_after_id}
+
+
+@router.get(
+    "/{username}",
+    dependencies=[Depends(admin_moderator)],
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": UserProfile}},
+)
 async def user_profile(
     username: str,
+    request: Request,
+    response: Response,
+    redis_client: Redis = Depends(init_async_redis),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> UserProfile | Response:
     """
     The user_profile function returns a user's profile information.
+    Profiles are cached in Redis for PROFILE_CACHE_TTL seconds; if Redis is unavailable the profile is read
+    from the database. The response carries an ETag, and a request whose If-None-Match matches it gets an
+    empty 304 response.
+    The profile is already a UserProfile built from our own data, so it is not validated again on the way out.
 
     :param username: str: Get the username from the request
+    :param request: Request: Read the If-None-Match header
+    :param response: Response: Set the caching headers
+    :param redis_client: Redis: The Redis client used for caching (dependency)
     :param db: AsyncSession: Inject the database session into the function
     :return: A user object
 
     """
 
-    user_exist = await repository_users.get_user_username(username, db)
-    if user_exist:
-        user = await repository_users.get_user_profile(user_exist, db)
-        return user
-    else:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("USER_NOT_FOUND"))
+    key = profile_cache_key(username)
+    try:
+        cached = await redis_client.get(key)
+    except RedisError:
+        cached = None
+
+    user = None
+    if cached is not None:
+        try:
+            user = UserProfile.model_validate_json(cached)
+        except ValidationError:
+            pass
+
+    if user is None:
+        user = await repository_users.get_user_profile_by_username(username, db)
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=_MSG_USER_NOT_FOUND)
+        # profiles are built without validation; only cache one that will pass it when read back
+        payload = user.model_dump_json()
+        try:
+            UserProfile.model_validate_json(payload)
+        except ValidationError:
+            payload = None
+        if payload is not None:
+            try:
+                await redis_client.set(key, payload, ex=PROFILE_CACHE_TTL)
+            except RedisError:
+                pass
+
+    headers = {"ETag": profile_etag(user), "Cache-Control": PROFILE_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return user
+
+
+@router.get("/{username}/avatar", dependencies=[Depends(admin_moderator_user)], response_class=RedirectResponse)
+async def user_avatar(username: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    The user_avatar function redirects to the user's avatar image.
+    The route needs authentication, so only the client's own cache may keep the redirect, and only briefly.
+    The response carries an ETag built from the avatar url, so a client revalidating with If-None-Match gets
+    an empty 304 response until the avatar changes.
+
+    :param username: str: Get the username from the request
+    :param request: Request: Read the If-None-Match header
+    :param db: AsyncSession: Inject the database session into the function
+    :return: A redirect to the avatar url
+    """
+
+    user = await repository_users.get_user_username(username, db)
+    if user is None or not user.avatar:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=_MSG_USER_NOT_FOUND)
+    headers = {"ETag": f'"{hashlib.md5(user.avatar.encode()).hexdigest()}"', "Cache-Control": AVATAR_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return RedirectResponse(user.avatar, headers=headers)
+
+
+async def _handle_ban(user_action: User, current_user: User, role: Role, db: AsyncSession) -> dict:
+    """
+    The _handle_ban function bans an active user.
+
+    :param user_action: User: The user to be banned
+    :param current_user: User: The user performing the action
+    :param role: Role: Not used by this action
+    :param db: AsyncSession: The database session
+    :return: A dictionary with the user and a message
+    """
+    if not user_action.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=_MSG_USER_HAS_ALREADY_BANNED)
+    user = await repository_users.ban_user(user_action.email, db)
+    return {"user": user, "detail": _BAN_TMPL.format(username=user_action.username)}
+
+
+async def _handle_activate(user_action: User, current_user: User, role: Role, db: AsyncSession) -> dict:
+    """
+    The _handle_activate function activates a banned user.
+
+    :param user_action: User: The user to be activated
+    :param current_user: User: The user performing the action
+    :param role: Role: Not used by this action
+    :param db: AsyncSession: The database session
+    :return: A dictionary with the user and a message
+    """
+    if user_action.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=_MSG_USER_ALREADY_ACTIVATED)
+    user = await repository_users.activate_user(user_action.email, db)
+    return {"user": user, "detail": _ACTIVATE_TMPL.format(username=user_action.username)}
+
+
+async def _handle_change_role(user_action: User, current_user: User, role: Role, db: AsyncSession) -> dict:
+    """
+    The _handle_change_role function gives a user a new role.
+
+    :param user_action: User: The user whose role is changed
+    :param current_user: User: The user performing the action
+    :param role: Role: The new role of the user
+    :param db: AsyncSession: The database session
+    :return: A dictionary with the user and a message
+    """
+    if role is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=_MSG_NEW_ROLE_MUST_BE_SPECIFIED)
+    user = await repository_users.change_role(user_action.email, role, db)
+    return {"user": user, "detail": _CHANGE_ROLE_TMPL.format(role=role)}
+
+
+# Action -> (roles allowed to perform it, message used when the role is not allowed, handler)
+_ACTION_TABLE = {
+    Action.ban: (
+        frozenset({Role.admin, Role.moderator}),
+        messages.get_message("YOU_DONT_HAVE_PERMISSION_TO_BAN_USERS"),
+        _handle_ban,
+    ),
+    Action.activate: (
+        frozenset({Role.admin}),
+        messages.get_message("YOU_DONT_HAVE_PERMISSION_FOR_ACTIVATE_USERS"),
+        _handle_activate,
+    ),
+    Action.change_role: (
+        frozenset({Role.admin}),
+        messages.get_message("YOU_DONT_HAVE_PERMISSION_FOR_CHANGE_USER_ROLES"),
+        _handle_change_role,
+    ),
+}
 
 
 @router.patch("/{username}", dependencies=[Depends(admin_moderator)], response_model=UserResponse)
@@ -108,22 +298,20 @@ async def manage_user(
     action: Action,
     role: Role = Role.user,
     current_user: User = Depends(auth_service.get_current_user),
-    redis_client: Redis = Depends(init_async_redis),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Manage a user's status, role, or ban.
     
     This function allows administrators and moderators to perform actions on a user. Available actions are:
-    - 'ban': Bans an active user. Raises an error if the user is already banned.
-    - 'activate': Activates a banned user. Raises an error if the user is already active.
-    - 'change_role': Changes the role of a user (except for admins) to a different role, excluding 'admin'.
+    - 'ban': Bans an active user. Raises an error if the user is already banned. Admins and moderators only.
+    - 'activate': Activates a banned user. Raises an error if the user is already active. Admins only.
+    - 'change_role': Changes the role of a user (except for admins) to a different role, excluding 'admin'. Admins only.
 
     :param username: str: The username of the user to be managed.
     :param action: Action: The action to be taken on the user.
     :param role: Role: The new role for the user (optional, defaults to 'user').
     :param current_user: User: The current user performing the action.
-    :param redis_client: Redis: The Redis client used for caching (dependency).
     :param db: AsyncSession: The database session (dependency).
 
     :return: Tuple[User, str]: A tuple containing the updated user and a message detailing the action.
@@ -132,49 +320,18 @@ async def manage_user(
     user_action = await repository_users.get_user_username(username, db)
 
     if not user_action:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.get_message("USER_NOT_FOUND"))
-
-    key_to_clear = f"user:{user_action.email}"
-    await redis_client.delete(key_to_clear)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=_MSG_USER_NOT_FOUND)
 
     if user_action.username == current_user.username:
-            return {"user": user_action, "detail": messages.get_message("YOU_CANT_BAN_YOURSELF")}
-  
-    if action == Action.ban:
-        if current_user.roles == (Role.admin or Role.moderator):
-            if user_action.is_active:
-                if user_action.username == current_user.username:
-                    return {"user": user_action, "detail": messages.get_message("YOU_CANT_BAN_YOURSELF")}
-                else:
-                    user = await repository_users.ban_user(user_action.email, db)
-                    return {"user": user, "detail": f"{user_action.username} " + messages.get_message("USER_HAS_BEEN_BANNED")}
-            else:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.get_message("USER_HAS_ALREADY_BANNED"))
-        else:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.get_message("YOU_DONT_HAVE_PERMISSION_TO_BAN_USERS"))
-
-    elif action == Action.activate:
-        if current_user.roles == Role.admin:
-            if not user_action.is_active:
-                user = await repository_users.activate_user(user_action.email, db)
-                return {"user": user, "detail": f"{user_action.username} " + messages.get_message("USER_HAS_BEEN_ACTIVATED")}
-            else:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.get_message("USER_ALREADY_ACTIVATED"))
-        else:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=messages.get_message("YOU_DONT_HAVE_PERMISSION_FOR_ACTIVATE_USERS"))
-
-    elif action == Action.change_role:
-        if current_user.roles == Role.admin:
-            if role is None:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
-                                    detail=messages.get_message("NEW_ROLE_MUST_BE_SPECIFIED_FOR_CHANGING_ROLE"))
-            
-            user = await repository_users.change_role(user_action.email, role, db)
-            return {"user": user, "detail": messages.get_message("USERS_ROLE_HAS_BEEN_CHANGED_TO") + f" {role}"}
-        else:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, 
-                                detail=messages.get_message("YOU_DONT_HAVE_PERMISSION_FOR_CHANGE_USER_ROLES"))
-    
-    else:
+        return {"user": user_action, "detail": _MSG_YOU_CANT_BAN_YOURSELF}
+
+    allowed_roles, denied_message, handler = _ACTION_TABLE.get(action, (None, None, None))
+    if handler is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
-                            detail=messages.get_message("INVALID_ACTION_SPECIFIED"))
\ No newline at end of file
+                            detail=_MSG_INVALID_ACTION_SPECIFIED)
+    if current_user.roles not in allowed_roles:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=denied_message)
+
+    result = await handler(user_action, current_user, role, db)
+    await auth_service.forget_user(f"user:{user_action.email}", profile_cache_key(user_action.username))
+    return result
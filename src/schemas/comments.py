@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CommentCreate(BaseModel):
@@ -12,4 +14,8 @@ class CommentDB(CommentCreate):
     model_config = ConfigDict(from_attributes=True)
     id: int
     text: str
-    user_id: int
\ No newline at end of file
+    user_id: int
+
+
+class PicturesCommentsRequest(BaseModel):
+    picture_ids: List[int] = Field(min_length=1, max_length=100)
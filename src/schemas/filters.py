@@ -44,6 +44,11 @@ class UserOut(UserIn):
     comments_user: Optional[List[CommentOut]] = []
 
 
+class UsersPage(BaseModel):
+    users: List[UserOut]
+    next_after_id: Optional[int] = None
+
+
 class CommentFilter(Filter):
     id: Optional[int] = None
     text__ilike: Optional[str] = None
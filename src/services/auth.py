@@ -6,6 +6,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.conf.config import init_async_redis, settings
@@ -14,6 +15,17 @@ from src.database.models import User
 from src.repository import users as repository_users
 
 
+def profile_cache_key(username: str) -> str:
+    """
+    The profile_cache_key function returns the Redis key of a user's cached profile.
+    It uses its own prefix, because user:{email} already holds the pickled user cached by get_current_user.
+
+    :param username: str: The username of the user
+    :return: The Redis key
+    """
+    return f"user_profile:{username}"
+
+
 class Auth:
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     SECRET_KEY = settings.secret_key
@@ -146,10 +158,14 @@ class Auth:
         except JWTError:
             raise credentials_exception
 
-        if await self.validate_token(token) or await repository_users.is_validate_token(token, db):
+        try:
+            token_revoked, user_r = await self.validate_token(token, email)
+        except RedisError:
+            token_revoked, user_r = await repository_users.is_validate_token(token, db), None
+
+        if token_revoked:
             raise credentials_exception
 
-        user_r = await (await self.redis_cache).get(f"user:{email}")
         if user_r is None:
             user = await repository_users.get_user_by_email(email, db)
             if user is None:
@@ -159,8 +175,10 @@ class Auth:
                 raise user_banned
 
             user_r = pickle.dumps(user)
-            await (await self.redis_cache).set(f"user:{email}", user_r)
-            await (await self.redis_cache).expire(f"user:{email}", 900)
+            try:
+                await (await self.redis_cache).set(f"user:{email}", user_r, ex=900)
+            except RedisError:
+                pass
 
         user_clean: User = pickle.loads(user_r)
         if not user_clean.is_active:
@@ -168,16 +186,37 @@ class Auth:
 
         return user_clean
 
-    async def validate_token(self, token: str) -> bool:
+    async def forget_user(self, *keys: str) -> None:
+        """
+        The forget_user function removes cached data of a user from Redis with a single DEL command,
+        so the next request loads it from the database. Routes call it after changing data the cache holds,
+        such as the user:{email} entry read by get_current_user.
+        A Redis outage is ignored; the cached copies then expire on their own.
+
+        :param keys: str: The keys to remove
+        :return: None
+        """
+        try:
+            await (await self.redis_cache).delete(*keys)
+        except RedisError:
+            pass
+
+    async def validate_token(self, token: str, email: str) -> tuple[bool, bytes | None]:
         """
         Validate the given token by checking if it's in the invalid tokens cache.
+        Revoked tokens are stored in Redis with the token's ttl, so a single EXISTS call answers the check.
+        The invalid_tokens table remains the durable record and is only queried when Redis is unavailable.
+        The cached user is fetched in the same pipeline, so an authenticated request costs one Redis round trip.
 
         :param token: Token to validate
-        :return: True if the token is valid, False otherwise
+        :param email: The email of the token's user
+        :return: True if the token has been revoked, False otherwise, and the cached user or none
         """
-        invalid_access_token = await (await self.redis_cache).get(f"access_token:{token}")
-        invalid_refresh_token = await (await self.redis_cache).get(f"refresh_token:{token}")
-        return invalid_access_token or invalid_refresh_token
+        async with (await self.redis_cache).pipeline(transaction=False) as pipe:
+            pipe.exists(f"access_token:{token}", f"refresh_token:{token}")
+            pipe.get(f"user:{email}")
+            revoked, user_r = await pipe.execute()
+        return revoked > 0, user_r
 
     def get_email_from_token(self, token: str) -> str:
         """
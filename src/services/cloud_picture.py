@@ -1,49 +1,87 @@
+import asyncio
 import hashlib
+import os
 
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
 
-from src.conf.config import settings
+from src.conf.config import init_cloudinary
+from src.conf.constant import CLOUDINARY_CHUNK_SIZE, LARGE_PICTURE_SIZE
 
 
 class CloudPicture:
-    cloudinary.config(
-        cloud_name=settings.cloudinary_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True,
-    )
-
     @staticmethod
     def generate_folder_name(email: str):
         """
-        The generate_folder_name function takes in an email address as a string and returns the first character of the
-        SHA256 hash of that email address.
+        The generate_folder_name function takes in an email address as a string and returns one of 16 folder names,
+        a single hex character picked by a 1-byte BLAKE2b hash of that email address.
+        The folder only spreads pictures across buckets, so a short non-cryptographic-strength digest is enough.
 
         :param email: str: Specify the type of parameter that is expected to be passed into the function
         :return: A string
         """
 
-        folder_name = hashlib.sha256(email.encode("utf-8")).hexdigest()[12]
+        folder_name = hashlib.blake2b(email.encode("utf-8"), digest_size=1).hexdigest()[0]
         return folder_name
 
     @staticmethod
-    def upload_picture(file, public_id: str, transformation: dict = {}):
+    async def upload_picture(file, public_id: str, transformation: dict = {}):
         """
         The upload_picture function takes in a file, public_id, and transformation.
             The function then uploads the picture to cloudinary with the given public_id and transformation.
+            The cloudinary uploader makes blocking HTTP calls, so the upload runs in a worker thread
+            and the event loop keeps serving other requests meanwhile.
             It returns a dictionary containing information about the uploaded picture.
 
-        :param file: Specify the file to upload
+        :param file: Specify the file to upload, a seekable file-like object
+        :param public_id: str: Specify the name of the file that is being uploaded
+        :param transformation: dict: Specify the transformation that will be applied to the image
+        :return: A dict with the image's url, id and more
+        """
+
+        return await asyncio.to_thread(CloudPicture._upload_picture, file, public_id, transformation)
+
+    @staticmethod
+    def _upload_picture(file, public_id: str, transformation: dict):
+        """
+        The _upload_picture function uploads a picture to cloudinary, blocking until the upload is done.
+            Files larger than LARGE_PICTURE_SIZE are streamed to cloudinary in chunks by upload_large_picture.
+
+        :param file: Specify the file to upload, a seekable file-like object
         :param public_id: str: Specify the name of the file that is being uploaded
         :param transformation: dict: Specify the transformation that will be applied to the image
         :return: A dict with the image's url, id and more
         """
 
+        init_cloudinary()
+        size = file.seek(0, os.SEEK_END)
+        file.seek(0)
+        if size > LARGE_PICTURE_SIZE:
+            return CloudPicture.upload_large_picture(file, public_id, transformation)
+
         r = cloudinary.uploader.upload(file, public_id=public_id, overwrite=True, transformation=transformation)
         return r
 
+    @staticmethod
+    def upload_large_picture(file, public_id: str, transformation: dict = {}):
+        """
+        The upload_large_picture function uploads a picture to cloudinary in chunks.
+            Only one chunk of the file is held in memory at a time, which suits large files.
+            It returns a dictionary containing information about the uploaded picture.
+
+        :param file: Specify the file to upload
+        :param public_id: str: Specify the name of the file that is being uploaded
+        :param transformation: dict: Specify the transformation that will be applied to the image
+        :return: A dict with the image's url, id and more
+        """
+
+        init_cloudinary()
+        r = cloudinary.uploader.upload_large(
+            file, chunk_size=CLOUDINARY_CHUNK_SIZE, public_id=public_id, overwrite=True, transformation=transformation
+        )
+        return r
+
     @staticmethod
     def get_url_for_picture(public_id, r):
         """
@@ -56,5 +94,6 @@ class CloudPicture:
         :return: A url for a picture
         """
 
+        init_cloudinary()
         src_url = cloudinary.CloudinaryImage(public_id).build_url(width=350, height=350, crop="fill", version=r.get("version"))
         return src_url
@@ -8,7 +8,7 @@ from src.services.auth import auth_service
 
 class RoleAccess:
     def __init__(self, allowed_roles: List[Role]):
-        self.allowed_roles = allowed_roles
+        self.allowed_roles = frozenset(allowed_roles)
 
     async def __call__(
         self,
@@ -19,6 +19,7 @@ class RoleAccess:
         The __call__ function is a decorator that allows us to use the class as a function.
         It takes in the request and current_user, which are passed by FastAPI automatically.
         The __call__ function then checks if the user's role is allowed for this endpoint.
+        current_user is the same cached dependency the route itself uses, so the check adds no database or Redis call.
 
         :param self: Access the class attributes
         :param request: Request: Access the request object
@@ -13,7 +13,9 @@ from src.database.models import Base
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///" + os.path.join(os.getcwd(), "test.sqlite")
 
 async_engine = create_async_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingAsyncDBSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession)
+TestingAsyncDBSessionLocal = async_sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=async_engine, class_=AsyncSession
+)
 
 
 @pytest_asyncio.fixture(scope="function")
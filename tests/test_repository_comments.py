@@ -1,11 +1,12 @@
 import unittest
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import Comment, User
 from src.repository.comments import (create_comment, delete_comment,
-                                     get_comments_of_user,
+                                     get_comments_for_pictures,
                                      get_comments_to_picture, update_comment)
 from src.schemas.comments import CommentCreate, CommentUpdate
 
@@ -36,25 +37,39 @@ class TestRepositoryComments(unittest.IsolatedAsyncioTestCase):
         comment_id = self._create_mock_comment().id
         mock_body = CommentUpdate(text="Updated comment text")
         self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_comment))
-        result = await update_comment(comment_id=comment_id, body=mock_body, current_user=self.user.id, db=self.session)
+        result = await update_comment(picture_id=self.mock_comment.picture_id, comment_id=comment_id, body=mock_body, current_user=self.user.id, db=self.session)
         self.assertNotEqual(result.text, self._create_mock_comment().text)
         self.assertEqual(result.text, "Updated comment text")
 
     async def test_delete_comment(self):
         comment_id = self._create_mock_comment().id
-        self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_comment))
-        result = await delete_comment(comment_id=comment_id, db=self.session)
+        self.session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=comment_id))
+        result = await delete_comment(comment_id=comment_id, picture_id=self.mock_comment.picture_id, db=self.session)
+        self.assertEqual(result, comment_id)
 
-    async def test_get_comments_of_user(self):
+    async def test_get_comments_to_picture_since_aware(self):
         self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_comment))
-        result = await get_comments_of_user(skip=0, limit=10, user_id=1, db=self.session)
-        self.assertTrue(result)
-        
+        since = datetime(2024, 1, 1, 2, 0, tzinfo=timezone(timedelta(hours=2)))
+        await get_comments_to_picture(skip=0, limit=10, picture_id=2, db=self.session, since=since)
+        query = self.session.execute.call_args.args[0]
+        params = query.compile().params
+        since_param = next(value for key, value in params.items() if key.startswith("created_at"))
+        self.assertEqual(since_param, datetime(2024, 1, 1, 0, 0))
+
     async def test_get_comments_to_picture(self):
         self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_comment))
         result = await get_comments_to_picture(skip=0, limit=10, picture_id=2, db=self.session)
         self.assertTrue(result)
 
 
+    async def test_get_comments_for_pictures(self):
+        mock_result = MagicMock()
+        mock_result.scalars().unique().all.return_value = [self.mock_comment]
+        self.session.execute.return_value = mock_result
+        result = await get_comments_for_pictures(picture_ids=[1, 2], db=self.session)
+        self.assertEqual(result[1], [self.mock_comment])
+        self.assertEqual(result[2], [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -6,9 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import Picture, Role, Tag, User
-from src.repository.pictures import (get_all_pictures,
-                                     get_all_pictures_of_user,
-                                     get_or_create_tag, get_picture_by_id,
+from src.repository.pictures import (get_or_create_tag, get_picture_by_id,
                                      get_qrcode, remove_picture,
                                      save_data_of_picture_to_db,
                                      update_picture_description,
@@ -182,16 +180,6 @@ class TestRepositoryPictures(unittest.IsolatedAsyncioTestCase):
         self.session.commit.assert_not_called()
         self.session.refresh.assert_not_called()
 
-    # ---------------------------------------------------------------testing of 'get_all_pictures' function
-
-    async def test_get_all_pictures(self):
-
-        self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_picture))
-        results = await get_all_pictures(skip=0, limit=10, db=self.session)
-
-        for result in results:
-            self.assertIsInstance(result, Picture)
-
     # ---------------------------------------------------------------testing of 'get_picture_by_id' function
 
     async def test_get_picture_by_id(self):
@@ -203,16 +191,6 @@ class TestRepositoryPictures(unittest.IsolatedAsyncioTestCase):
         for result in results:
             self.assertIsInstance(result, Picture)
 
-    # ---------------------------------------------------------------testing of 'get_all_pictures_of_user' function
-
-    async def test_get_all_pictures_of_user(self):
-
-        self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_picture))
-        results = await get_all_pictures_of_user(user_id=self.user.id, skip=0, limit=10, db=self.session)
-
-        for result in results:
-            self.assertIsInstance(result, Picture)
-
     # ---------------------------------------------------------------testing of 'remove_picture' function
 
     async def test_remove_picture_success(self):
@@ -239,14 +217,14 @@ class TestRepositoryPictures(unittest.IsolatedAsyncioTestCase):
     async def test_get_qrcode(self):
 
         expected_qrcode = "https://example.com/test.jpg"
-        mock_generate_qrcode = AsyncMock(return_value=expected_qrcode)
+        mock_generate_qrcode = MagicMock(return_value=expected_qrcode)
         picture = self.mock_picture
         self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_picture))
 
         with patch('src.services.qrcode_generator.qrcode_generator.generate_qrcode', mock_generate_qrcode):
             result = await get_qrcode(picture_id=picture.id, db=self.session)
 
-        self.assertIsNotNone(result)
+        self.assertEqual(result, expected_qrcode)
 
 
 if __name__ == '__main__':
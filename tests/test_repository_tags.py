@@ -5,34 +5,38 @@ from unittest.mock import AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import Tag
-from src.repository.tags import (get_tag_by_id, get_tag_by_tagname, get_tags,
-                                 remove_tag,
-                                 update_tag)
-from src.schemas.tags import TagModel, TagResponse
+from src.repository.tags import (clear_tag_cache, get_tag_by_id,
+                                 get_tag_by_tagname, get_tags, remove_tag,
+                                 rename_tag)
+from src.schemas.tags import TagResponse
 
 
 class TestRepositoryTags(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
+        clear_tag_cache()
         self.session = AsyncMock(spec=AsyncSession)
+        self.expected_id = 1
+        self.expected_tagname = "alex"
         self.mock_tag = self._create_mock_tag()
-        self.mock_tag_response = self._create_tag_response
+        self.mock_tag_response = self._create_tag_response()
         
     def tearDown(self):
         del self.session
         
     def _create_mock_tag(self):
         tag = Tag()
-        tag.id = 1
-        tag.tagname = "alex"
+        tag.id = self.expected_id
+        tag.tagname = self.expected_tagname
         return tag
     
     def _create_tag_response(self):
-        tag_response = TagResponse()
-        tag_response.id=1,
-        tag_response.tagname="alex",
-        tag_response.created_at=datetime.time,
-        tag_response.updated_at=datetime.time
+        return TagResponse(
+            id=self.expected_id,
+            tagname=self.expected_tagname,
+            created_at=datetime(2023, 1, 1),
+            updated_at=datetime(2023, 1, 1),
+        )
         
     async def test_get_tags(self):
         self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_tag))
@@ -41,23 +45,42 @@ class TestRepositoryTags(unittest.IsolatedAsyncioTestCase):
         
     async def test_get_tag_by_id(self):
         self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_tag))
-        result = await get_tag_by_id(tag_id=self._create_mock_tag().id, db=self.session)
-        self.assertEqual(result.id, self._create_mock_tag().id)
+        result = await get_tag_by_id(tag_id=self.expected_id, db=self.session)
+        self.assertEqual(result.id, self.expected_id)
         
+    async def test_get_tag_by_id_cached(self):
+        self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_tag))
+        await get_tag_by_id(tag_id=self.expected_id, db=self.session)
+        result = await get_tag_by_tagname(tagname=self.expected_tagname, db=self.session)
+        self.assertEqual(result.id, self.expected_id)
+        self.session.execute.assert_awaited_once()
+
     async def test_get_tag_by_tagname(self):
         self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_tag))
-        result = await get_tag_by_tagname(tagname=self._create_mock_tag().tagname, db=self.session)
-        self.assertEqual(result.tagname, self._create_mock_tag().tagname)
+        result = await get_tag_by_tagname(tagname=self.expected_tagname, db=self.session)
+        self.assertEqual(result.tagname, self.expected_tagname)
+
+    async def test_rename_tag(self):
+        renamed_tag = self._create_mock_tag()
+        renamed_tag.tagname = 'test'
+        self.session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=renamed_tag))
+        result = await rename_tag(tag_id=self.expected_id, tagname='test', db=self.session)
+        self.assertEqual(result.id, self.mock_tag_response.id)
+        self.assertNotEqual(result.tagname, self.mock_tag_response.tagname)
 
-    async def test_update_tag(self):
-        body = TagModel(tagname='test')
-        self.session.execute.return_value = MagicMock(tag_response=MagicMock(return_value=self.mock_tag_response))
-        result = await update_tag(tag_id=self._create_mock_tag().id, body=body, db=self.session)
-        self.assertNotEqual(result.tagname, self._create_mock_tag().tagname)
+    async def test_rename_tag_not_found(self):
+        self.session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+        result = await rename_tag(tag_id=self.expected_id, tagname='test', db=self.session)
+        self.assertIsNone(result)
 
     async def test_remove_tag(self):
-        self.session.execute.return_value = MagicMock(scalar=MagicMock(return_value=self.mock_tag))
-        result = await remove_tag(tag_id=self._create_mock_tag().id, db=self.session)
+        self.session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=self.mock_tag.id))
+        result = await remove_tag(tag_id=self.expected_id, db=self.session)
+        self.assertEqual(result, self.expected_id)
+
+    async def test_remove_tag_not_found(self):
+        self.session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+        result = await remove_tag(tag_id=self.expected_id, db=self.session)
         self.assertIsNone(result)
 
 
@@ -1,4 +1,3 @@
-from datetime import datetime
 import unittest
 from typing import List
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -9,10 +8,11 @@ from src.database.models import Role, User
 from src.repository.users import (activate_user, ban_user, change_password,
                                   change_role, confirmed_email, create_user,
                                   edit_my_profile, get_all_users,
-                                  get_user_by_email, get_user_profile,
+                                  get_gravatar_url, get_user_by_email,
+                                  get_user_profile_by_username,
                                   get_user_username, invalidate_token,
                                   is_validate_token, update_token)
-from src.schemas.users import UserModel, UserProfile
+from src.schemas.users import UserModel
 
 
 class TestRepositoryPictures(unittest.IsolatedAsyncioTestCase):
@@ -59,31 +59,45 @@ class TestRepositoryPictures(unittest.IsolatedAsyncioTestCase):
         
         self.assertEqual(search_user, None)
         
+    def test_get_gravatar_url(self):
+        url = get_gravatar_url(" Email_Test@gmail.com ")
+
+        self.assertEqual(url, get_gravatar_url("email_test@gmail.com"))
+        self.assertTrue(url.startswith("https://www.gravatar.com/avatar/"))
+
     async def test_create_user(self):
         body = UserModel(username="username_test", email="email_test@gmail.com", password="password_test")
 
-        mock_result = MagicMock()
-        mock_result.scalar.return_value = self.mock_user
-        self.session.execute.return_value = mock_result
-        
-        new_user = await create_user(body, self.session)
+        self.session.scalar.return_value = True
+
+        with patch("src.repository.users._admin_exists", False):
+            new_user = await create_user(body, self.session)
 
         self.assertIsInstance(new_user, User)
         self.assertEqual(new_user.username, "username_test")
-        
+        self.assertNotEqual(new_user.roles, "admin")
+
     async def test_create_user_admin(self):
         body = UserModel(username="username_test", email="email_test@gmail.com", password="password_test")
 
-        mock_result = MagicMock()
-        mock_result.scalar.return_value = None
-        self.session.execute.return_value = mock_result
-        
-        new_user = await create_user(body, self.session)
+        self.session.scalar.return_value = False
+
+        with patch("src.repository.users._admin_exists", False):
+            new_user = await create_user(body, self.session)
 
         self.assertIsInstance(new_user, User)
         self.assertEqual(new_user.username, "username_test")
         self.assertEqual(new_user.roles, "admin")
 
+    async def test_create_user_admin_exists(self):
+        body = UserModel(username="username_test", email="email_test@gmail.com", password="password_test")
+
+        with patch("src.repository.users._admin_exists", True):
+            new_user = await create_user(body, self.session)
+
+        self.session.scalar.assert_not_called()
+        self.assertNotEqual(new_user.roles, "admin")
+
     async def test_update_token(self):
         refresh_token = "refresh_token_test"
         
@@ -93,17 +107,37 @@ class TestRepositoryPictures(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(self.mock_user.refresh_token, refresh_token)
         
     async def test_confirmed_email(self):
-        self.assertFalse(self.mock_user.confirmed)
-        
-        get_user_by_email_mock = AsyncMock(return_value=self.mock_user)
-        
-        with patch("src.repository.users.get_user_by_email", get_user_by_email_mock):
-            await confirmed_email(self.mock_user.email, self.session)
-            
-        self.assertTrue(self.mock_user.confirmed) 
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = self.mock_user
+        self.session.execute.return_value = mock_result
+
+        await confirmed_email(self.mock_user.email, self.session)
+
+        self.session.execute.assert_awaited_once()
+        self.session.commit.assert_awaited_once()
             
     async def test_edit_my_profile(self):
-        pass
+        self.mock_user.username = "new_username"
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = self.mock_user
+        self.session.execute.return_value = mock_result
+
+        user = await edit_my_profile(self.mock_user.email, None, "new_username", self.session)
+
+        self.assertEqual(user.username, "new_username")
+        self.session.execute.assert_awaited_once()
+        self.session.commit.assert_awaited_once()
+
+    async def test_edit_my_profile_name_taken(self):
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = None
+        self.session.execute.return_value = mock_result
+
+        with patch("src.repository.users.CloudPicture.upload_picture", new_callable=AsyncMock) as upload_mock:
+            user = await edit_my_profile(self.mock_user.email, MagicMock(), "taken_username", self.session)
+
+        self.assertIsNone(user)
+        upload_mock.assert_not_awaited()
     
     async def test_change_password(self):
         password_mock = "new_password"
@@ -145,87 +179,67 @@ class TestRepositoryPictures(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(users, List)
         self.assertEqual(users[0].username, self.mock_user.username)
         
-    async def test_get_user_profile(self):
+    async def test_get_user_profile_by_username(self):
         mock_result = MagicMock()
-        mock_result.scalar.return_value = 5
+        mock_result.one_or_none.return_value = (self.mock_user, 4, 10)
         self.session.execute.return_value = mock_result
-        with patch("src.schemas.users.UserProfile") as user_profile_mock:
-            profile_mock =  user_profile = UserProfile(
-                                                    id=self.mock_user.id,
-                                                    roles=self.mock_user.roles,
-                                                    username=self.mock_user.username,
-                                                    email=self.mock_user.email,
-                                                    avatar=self.mock_user.avatar,
-                                                    is_active=self.mock_user.is_active,
-                                                    pictures_count=4,
-                                                    comments_count=10,
-                                                    confirmed=self.mock_user.confirmed,
-                                                    created_at=datetime(2023, 1, 1),
-                                                    updated_at=datetime(2023, 1, 1),
-                                                )
-            user_profile_mock.return_value = profile_mock
-            
-            user_profile = await get_user_profile(self.mock_user, self.session)
-            
-        self.assertEqual(user_profile.id, self.mock_user.id)
-        self.assertEqual(user_profile.pictures_count, 5)
-        self.assertEqual(user_profile.comments_count, 5)
-        
-        
-    async def test_get_user_profile_none(self):
-            
-        user_profile = await get_user_profile(None, self.session)
-            
-        self.assertEqual(user_profile, None)
+
+        user_profile = await get_user_profile_by_username(self.mock_user.username, self.session)
+
+        self.assertEqual(user_profile.username, self.mock_user.username)
+        self.assertEqual(user_profile.pictures_count, 4)
+        self.assertEqual(user_profile.comments_count, 10)
+        self.session.execute.assert_awaited_once()
+
+    async def test_get_user_profile_by_username_none(self):
+        mock_result = MagicMock()
+        mock_result.one_or_none.return_value = None
+        self.session.execute.return_value = mock_result
+
+        user_profile = await get_user_profile_by_username(self.mock_user.username, self.session)
+
+        self.assertIsNone(user_profile)
         
         
     async def test_ban_user(self):
-        self.assertTrue(self.mock_user.is_active)
-        
-        get_user_by_email_mock = AsyncMock(return_value=self.mock_user)
-        
-        with patch("src.repository.users.get_user_by_email", get_user_by_email_mock):
-            await ban_user(self.mock_user.email, self.session)
-            
-        self.assertFalse(self.mock_user.is_active) 
-        
-        
+        self.mock_user.is_active = False
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = self.mock_user
+        self.session.execute.return_value = mock_result
+
+        user = await ban_user(self.mock_user.email, self.session)
+
+        self.assertFalse(user.is_active)
+        self.session.commit.assert_awaited_once()
+
     async def test_ban_user_none(self):
-        self.assertTrue(self.mock_user.is_active)
-        
-        get_user_by_email_mock = AsyncMock(return_value=None)
-        
-        with patch("src.repository.users.get_user_by_email", get_user_by_email_mock):
-            user = await ban_user(self.mock_user.email, self.session)
-            
-        self.assertFalse(user)
-        
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = None
+        self.session.execute.return_value = mock_result
+
+        user = await ban_user(self.mock_user.email, self.session)
+
+        self.assertIsNone(user)
+
     async def test_activate_user(self):
-        self.assertTrue(self.mock_user.is_active)
-        
-        get_user_by_email_mock = AsyncMock(return_value=self.mock_user)
-        
-        with patch("src.repository.users.get_user_by_email", get_user_by_email_mock):
-            await ban_user(self.mock_user.email, self.session)
-        
-        self.assertFalse(self.mock_user.is_active) 
-        
-        get_user_by_email_mock = AsyncMock(return_value=self.mock_user)
-        
-        with patch("src.repository.users.get_user_by_email", get_user_by_email_mock):
-            await activate_user(self.mock_user.email, self.session)
-            
-        self.assertTrue(self.mock_user.is_active)
-    
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = self.mock_user
+        self.session.execute.return_value = mock_result
+
+        user = await activate_user(self.mock_user.email, self.session)
+
+        self.assertTrue(user.is_active)
+        self.session.commit.assert_awaited_once()
+
     async def test_activate_user_none(self):
-        
-        get_user_by_email_mock = AsyncMock(return_value=None)
-        
-        with patch("src.repository.users.get_user_by_email", get_user_by_email_mock):
-            user = await activate_user(self.mock_user.email, self.session)
-            
-        self.assertFalse(user)
-        
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = None
+        self.session.execute.return_value = mock_result
+
+        user = await activate_user(self.mock_user.email, self.session)
+
+        self.assertIsNone(user)
+
     async def test_invalidate_token(self):
         token = "test_token"
 